@@ -0,0 +1,380 @@
+"""
+Benchmark harness for ComfyUI-Notebook execution overhead.
+
+Runs without ComfyUI: lightweight stubs stand in for 'server.PromptServer',
+'comfy_api', 'comfy_api_nodes' and 'comfy_execution', and the extension is
+loaded through its real 'comfy_entrypoint()'. Requires torch, numpy and
+matplotlib (the same packages the extension itself needs).
+
+Usage:
+    python benchmarks/bench_notebook.py [--output bench_results.json] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import types
+from datetime import datetime
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "comfyui_notebook_bench"
+
+
+# ---------------------------------------------------------------------------
+# Stubs for the ComfyUI modules the extension imports
+# ---------------------------------------------------------------------------
+
+
+class _NullWriter:
+    """Swallow console output so print-heavy cells don't measure the terminal."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class _RouteTable:
+    """Record aiohttp-style route registrations so handlers can be called directly."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def _register(self, method, path):
+        def decorator(handler):
+            self.handlers[(method, path)] = handler
+            return handler
+
+        return decorator
+
+    def get(self, path):
+        return self._register("GET", path)
+
+    def post(self, path):
+        return self._register("POST", path)
+
+
+class _PromptQueue:
+    def __init__(self):
+        self.flags = {}
+
+    def set_flag(self, name, value):
+        self.flags[name] = value
+
+
+class _PromptServer:
+    instance = None
+
+    def __init__(self):
+        self.routes = _RouteTable()
+        self.prompt_queue = _PromptQueue()
+        self.client_id = "bench"
+        self.sent_messages = 0
+
+    def send_sync(self, event, data, sid=None):
+        self.sent_messages += 1
+
+
+def _install_stubs():
+    # server
+    server = types.ModuleType("server")
+    server.PromptServer = _PromptServer
+    _PromptServer.instance = _PromptServer()
+    sys.modules["server"] = server
+
+    # comfy_api.latest
+    class ComfyNode:
+        hidden = types.SimpleNamespace(extra_pnginfo={"workflow": {"id": "bench"}}, unique_id="1")
+        SCHEMA = None
+
+    class ComfyExtension:
+        pass
+
+    class Schema:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class _Port:
+        def __init__(self, *args, **kwargs):
+            self.args = args
+            self.kwargs = kwargs
+
+    def _io_type(name):
+        return type(name, (), {"Input": _Port, "Output": _Port})
+
+    class NodeOutput:
+        def __init__(self, *args, ui=None, **kwargs):
+            self.args = args
+            self.ui = ui
+
+    io = types.SimpleNamespace(
+        ComfyNode=ComfyNode,
+        Schema=Schema,
+        NodeOutput=NodeOutput,
+        String=_io_type("String"),
+        AnyType=_io_type("AnyType"),
+        Image=_io_type("Image"),
+        Combo=_io_type("Combo"),
+        Float=_io_type("Float"),
+        Boolean=_io_type("Boolean"),
+    )
+    comfy_api = types.ModuleType("comfy_api")
+    latest = types.ModuleType("comfy_api.latest")
+    latest.ComfyExtension = ComfyExtension
+    latest.io = io
+    comfy_api.latest = latest
+    sys.modules["comfy_api"] = comfy_api
+    sys.modules["comfy_api.latest"] = latest
+
+    # comfy_api_nodes.util
+    class ProcessingInterrupted(Exception):
+        pass
+
+    helpers = types.ModuleType("comfy_api_nodes.util._helpers")
+    helpers.is_processing_interrupted = lambda: False
+    exceptions = types.ModuleType("comfy_api_nodes.util.common_exceptions")
+    exceptions.ProcessingInterrupted = ProcessingInterrupted
+    sys.modules["comfy_api_nodes"] = types.ModuleType("comfy_api_nodes")
+    sys.modules["comfy_api_nodes.util"] = types.ModuleType("comfy_api_nodes.util")
+    sys.modules["comfy_api_nodes.util._helpers"] = helpers
+    sys.modules["comfy_api_nodes.util.common_exceptions"] = exceptions
+
+    # comfy_execution.utils
+    context = types.SimpleNamespace(prompt_id="bench-prompt", node_id="1")
+    execution_utils = types.ModuleType("comfy_execution.utils")
+    execution_utils.get_executing_context = lambda: context
+    sys.modules["comfy_execution"] = types.ModuleType("comfy_execution")
+    sys.modules["comfy_execution.utils"] = execution_utils
+
+
+def _load_package():
+    """Import the extension as a package so its relative imports resolve."""
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        os.path.join(PACKAGE_DIR, "__init__.py"),
+        submodule_search_locations=[PACKAGE_DIR],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    asyncio.run(package.comfy_entrypoint())
+    return package
+
+
+# ---------------------------------------------------------------------------
+# Measurement helpers
+# ---------------------------------------------------------------------------
+
+
+def _summarize(samples, **extra):
+    samples_ms = [s * 1000.0 for s in samples]
+    ordered = sorted(samples_ms)
+    result = {
+        "n": len(samples_ms),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max_ms": ordered[-1],
+    }
+    result.update(extra)
+    return result
+
+
+def _time(fn, repeat, warmup=2):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _run_cell(NotebookCell, code, **kwargs):
+    old_stdout = sys.stdout
+    sys.stdout = _NullWriter()
+    try:
+        return NotebookCell.execute(code, **kwargs)
+    finally:
+        sys.stdout = old_stdout
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+
+def bench_empty_cell(package, repeat):
+    NotebookCell = package.NotebookCell
+    return _summarize(_time(lambda: _run_cell(NotebookCell, ""), repeat))
+
+
+def bench_print_heavy(package, repeat, lines=5000):
+    NotebookCell = package.NotebookCell
+    code = f"for i in range({lines}):\n    print('line', i)\n"
+    server = sys.modules["server"].PromptServer.instance
+    sent_before = server.sent_messages
+    samples = _time(lambda: _run_cell(NotebookCell, code), repeat)
+    output = _run_cell(NotebookCell, code)
+    stdout_bytes = len(output.args[2].encode("utf-8"))
+    return _summarize(
+        samples,
+        lines=lines,
+        stdout_bytes=stdout_bytes,
+        ui_messages_per_cell=(server.sent_messages - sent_before) / (repeat + 3),
+    )
+
+
+def bench_loop_heavy(package, repeat, iterations=20000):
+    """
+    Time the same loop inside one cell with the interrupt-checking builtins and
+    with the original builtins, so the fixed per-cell cost (temp file, thread,
+    stdout tee) cancels out of the per-call wrapper cost.
+    """
+    NotebookCell = package.NotebookCell
+    code = (
+        "import time as _time, builtins as _builtins\n"
+        "def _loop(range, zip):\n"
+        "    total = 0\n"
+        f"    for i in range({iterations}):\n"
+        "        for a, b in zip(range(2), range(2)):\n"
+        "            total += a + b\n"
+        "    return total\n"
+        "_start = _time.perf_counter()\n"
+        "_loop(range, zip)\n"
+        "_wrapped = _time.perf_counter() - _start\n"
+        "_start = _time.perf_counter()\n"
+        "_loop(_builtins.range, _builtins.zip)\n"
+        "_plain = _time.perf_counter() - _start\n"
+        "Result = (_wrapped, _plain)\n"
+    )
+    wrapped_samples, plain_samples, cell_samples = [], [], []
+    for i in range(repeat + 2):
+        start = time.perf_counter()
+        output = _run_cell(NotebookCell, code)
+        elapsed = time.perf_counter() - start
+        if i >= 2:  # Warmup
+            cell_samples.append(elapsed)
+            wrapped_samples.append(output.args[0][0])
+            plain_samples.append(output.args[0][1])
+    wrapped = _summarize(wrapped_samples)
+    plain = _summarize(plain_samples)
+    wrapped_calls = iterations * 3 + 1
+    return {
+        "iterations": iterations,
+        "cell": _summarize(cell_samples),
+        "loop_wrapped": wrapped,
+        "loop_plain": plain,
+        "wrapper_overhead_ms": wrapped["median_ms"] - plain["median_ms"],
+        "overhead_ns_per_wrapped_call": (wrapped["median_ms"] - plain["median_ms"]) * 1e6 / wrapped_calls,
+    }
+
+
+def bench_plot_capture(package, repeat, plots_per_cell=4):
+    NotebookCell = package.NotebookCell
+    code = (
+        "for k in range(%d):\n"
+        "    plt.figure(figsize=[4, 3])\n"
+        "    plt.plot(np.arange(100), np.sin(np.arange(100) / (k + 1)))\n"
+        "    Notebook.add_plot()\n" % plots_per_cell
+    )
+    samples = _time(lambda: _run_cell(NotebookCell, code), repeat)
+    summary = _summarize(samples, plots_per_cell=plots_per_cell)
+    summary["plots_per_second"] = plots_per_cell * 1000.0 / summary["median_ms"]
+    return summary
+
+
+def bench_list_variables(package, repeat, variables=10000, kernels=4):
+    import numpy as np
+
+    kernels_dict = package._NOTEBOOK_KERNELS
+    saved = dict(kernels_dict)
+    kernels_dict.clear()
+    try:
+        for k in range(kernels):
+            kernel = types.ModuleType(f"notebook_kernel_bench_{k}")
+            kernel.__dict__.update(package._PRELOAD_MODULES)
+            for i in range(variables):
+                kernel.__dict__[f"var_{i}"] = np.arange(i % 64) if i % 2 else f"value {i}" * 10
+            kernels_dict[f"bench_{k}"] = kernel
+
+        handler = sys.modules["server"].PromptServer.instance.routes.handlers[("GET", "/notebook/list_variables")]
+        request = types.SimpleNamespace()
+        loop = asyncio.new_event_loop()
+        try:
+            samples = _time(lambda: loop.run_until_complete(handler(request)), repeat, warmup=1)
+        finally:
+            loop.close()
+        return _summarize(samples, kernels=kernels, variables_per_kernel=variables)
+    finally:
+        kernels_dict.clear()
+        kernels_dict.update(saved)
+
+
+BENCHMARKS = {
+    "empty_cell": bench_empty_cell,
+    "print_heavy": bench_print_heavy,
+    "loop_heavy": bench_loop_heavy,
+    "plot_capture": bench_plot_capture,
+    "list_variables": bench_list_variables,
+}
+
+
+def _package_version():
+    try:
+        with open(os.path.join(PACKAGE_DIR, "pyproject.toml"), encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("version"):
+                    return line.split("=", 1)[1].strip().strip('"')
+    except OSError:
+        pass
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ComfyUI-Notebook execution overhead.")
+    parser.add_argument("--output", default="bench_results.json", help="Path of the JSON results file.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per benchmark.")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+    args = parser.parse_args(argv)
+
+    _install_stubs()
+    package = _load_package()
+
+    import torch
+    import numpy as np
+
+    results = {
+        "meta": {
+            "version": _package_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "torch": torch.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+        },
+        "benchmarks": {},
+    }
+
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        results["benchmarks"][name] = BENCHMARKS[name](package, args.repeat)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results["benchmarks"], indent=2))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,15 @@ import types
 import torch
 import numpy as np
 import threading
+import time
 from comfy_api.latest import io
 from comfy_api_nodes.util._helpers import is_processing_interrupted
 from comfy_api_nodes.util.common_exceptions import ProcessingInterrupted
 import server
+from .notebook_transfer import TRANSFER_POLICIES, TransferSession, _TRANSFER_TOTALS
+from . import notebook_metrics
+from . import notebook_packing
+from .notebook_limits import CellBudgetExceeded, _KERNEL_LIMITS, _KERNEL_LOCKS, effective_limit
 
 
 class TeeOutput:
@@ -50,6 +55,14 @@ def _get_notebook_globals():
 class NotebookCellUtils:
     plots = []
     expected_plot_shape = None  # Store expected shape: (H, W, 3)
+    transfer_stats = {}  # Bytes moved by the transfer policy of the current cell
+    transfer_totals = _TRANSFER_TOTALS  # Running totals across all cells
+    workflow_id = None  # Workflow ID of the kernel running the current cell
+
+    @classmethod
+    def set_kernel_limits(cls, timeout=None, cpu_budget=None):
+        """Set default wall-clock timeout and CPU budget (seconds, 0 = none) for cells of this kernel."""
+        return _KERNEL_LIMITS.set(cls.workflow_id, timeout=timeout, cpu_budget=cpu_budget)
 
     @classmethod
     def clear_plots(cls):
@@ -73,6 +86,7 @@ class NotebookCellUtils:
                     break
 
             if has_data:
+                capture_start = time.perf_counter()
                 buf = BytesIO()
                 fig.savefig(buf, format="png", dpi=100)
                 buf.seek(0)
@@ -87,6 +101,8 @@ class NotebookCellUtils:
                     if cls.expected_plot_shape != img_array.shape:
                         raise ValueError(f"The figsize of all plots must be the same.")
                 cls.plots.append(torch.from_numpy(img_array)[None,])
+                notebook_metrics.PLOTS.inc()
+                notebook_metrics.PLOT_CAPTURE_SECONDS.observe(time.perf_counter() - capture_start)
 
     @classmethod
     def get_plot_tensor(cls):
@@ -118,6 +134,35 @@ class NotebookCell(io.ComfyNode):
                     optional=True,
                     tooltip="Optional extra input. Access via 'input_2' variable.",
                 ),
+                io.Combo.Input(
+                    "transfer",
+                    options=TRANSFER_POLICIES,
+                    default="keep",
+                    optional=True,
+                    tooltip="How tensors in 'input', 'input_2' and 'Result' are transferred: keep as is, move to pinned CPU memory, expose as zero-copy numpy views, or make contiguous. Applied once per cell.",
+                ),
+                io.Float.Input(
+                    "timeout",
+                    default=0.0,
+                    min=0.0,
+                    step=1.0,
+                    optional=True,
+                    tooltip="Wall-clock time limit in seconds (0 = no limit). The kernel limit applies too; the stricter one wins.",
+                ),
+                io.Float.Input(
+                    "cpu_budget",
+                    default=0.0,
+                    min=0.0,
+                    step=1.0,
+                    optional=True,
+                    tooltip="CPU time limit in seconds for the cell's code (0 = no limit). Checked inside loops, like interrupts.",
+                ),
+                io.Boolean.Input(
+                    "pack_result",
+                    default=False,
+                    optional=True,
+                    tooltip="Pack a large numeric list or dict of arrays in 'Result' into contiguous buffers. Notebook cells receiving it get zero-copy numpy/torch views; other nodes receive the packed wrapper.",
+                ),
             ],
             outputs=[
                 io.AnyType.Output(display_name="Result"),
@@ -127,7 +172,31 @@ class NotebookCell(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, code: str, input=None, input_2=None) -> io.NodeOutput:
+    def execute(
+        cls,
+        code: str,
+        input=None,
+        input_2=None,
+        transfer="keep",
+        timeout=0.0,
+        cpu_budget=0.0,
+        pack_result=False,
+    ) -> io.NodeOutput:
+        # Count every failure here, whichever step raised it (compile, plots, transfer, packing, ...)
+        try:
+            return cls._execute_cell(code, input, input_2, transfer, timeout, cpu_budget, pack_result)
+        except ProcessingInterrupted:
+            notebook_metrics.CELL_INTERRUPTS.inc()
+            raise
+        except CellBudgetExceeded:
+            notebook_metrics.CELL_TIMEOUTS.inc()
+            raise
+        except Exception:
+            notebook_metrics.CELL_ERRORS.inc()
+            raise
+
+    @classmethod
+    def _execute_cell(cls, code, input, input_2, transfer, timeout, cpu_budget, pack_result) -> io.NodeOutput:
         try:
             workflow_id = cls.hidden.extra_pnginfo["workflow"]["id"]
         except:
@@ -145,17 +214,17 @@ class NotebookCell(io.ComfyNode):
         kernel = _NOTEBOOK_KERNELS[workflow_id]
         _NOTEBOOK_GLOBALS = kernel.__dict__
 
-        # Expose objects to the cells
-        NotebookCellUtils.clear_plots()
-        _NOTEBOOK_GLOBALS.update(
-            {
-                "input": input,
-                "input_2": input_2,
-                "Notebook": NotebookCellUtils,
-                "Result": None,
-            }
-        )
-        # _NOTEBOOK_GLOBALS.update(_PRELOAD_MODULES)
+        # Apply the transfer policy once at the cell boundary; a tensor feeding both inputs is converted once
+        # Packed Results from upstream cells are unpacked first, as zero-copy views
+        transfer_session = TransferSession(transfer or "keep")
+        input = transfer_session.apply(notebook_packing.unpack_result(input))
+        input_2 = transfer_session.apply(notebook_packing.unpack_result(input_2))
+        NotebookCellUtils.transfer_stats = transfer_session.stats
+
+        # Combine the cell limits with the kernel limits
+        kernel_limits = _KERNEL_LIMITS.get(workflow_id)
+        timeout = effective_limit(timeout, kernel_limits["timeout"])
+        cpu_budget = effective_limit(cpu_budget, kernel_limits["cpu_budget"])
 
         # Capture stdout
         stdout_capture = io_module.StringIO()
@@ -237,6 +306,35 @@ class NotebookCell(io.ComfyNode):
                 pass
             stdout_state["last_output_length"] = len(current_output)
 
+        # A cell stopped by its timeout may still be running; wait until it releases the kernel.
+        # The wait counts against this cell's timeout, and freeing the kernel ends it.
+        def notify_waiting():
+            stdout_capture.write(
+                "\u200b[Waiting for a previous cell of this kernel to stop. Free the kernel to stop waiting.]"
+            )
+            push_stdout_updates(force=True)
+
+        kernel_lock = _KERNEL_LOCKS.acquire(
+            workflow_id, timeout=timeout, should_abort=is_processing_interrupted, on_wait=notify_waiting
+        )
+        if kernel_lock is None:
+            raise ProcessingInterrupted("Code execution interrupted by user")
+        lock_handed_off = False  # Set once the execution thread owns the lock
+
+        # Expose objects to the cells
+        NotebookCellUtils.clear_plots()
+        NotebookCellUtils.workflow_id = workflow_id
+        _NOTEBOOK_GLOBALS.update(
+            {
+                "input": input,
+                "input_2": input_2,
+                "Notebook": NotebookCellUtils,
+                "Result": None,
+            }
+        )
+        # _NOTEBOOK_GLOBALS.update(_PRELOAD_MODULES)
+
+        execution_start = time.perf_counter()
         try:
             sys.stdout = TeeOutput(old_stdout, stdout_capture)
 
@@ -285,11 +383,15 @@ class NotebookCell(io.ComfyNode):
             execution_result = {"exception": None}
             execution_event = threading.Event()
             interrupt_flag = threading.Event()
+            cpu_state = {"start": 0.0}
 
             # Create interrupt check function
             def check_interrupt():
                 if interrupt_flag.is_set():
                     raise ProcessingInterrupted("Code execution interrupted by user")
+                # Called from the execution thread, so thread_time() is the cell's CPU time
+                if cpu_budget and time.thread_time() - cpu_state["start"] > cpu_budget:
+                    raise CellBudgetExceeded(f"Cell exceeded its CPU budget of {cpu_budget:g}s")
 
             # Wrap common built-in functions to check interrupts periodically
             _original_range = range
@@ -340,18 +442,22 @@ class NotebookCell(io.ComfyNode):
                     _NOTEBOOK_GLOBALS["filter"] = interrupt_checking_filter
                     _NOTEBOOK_GLOBALS["check_interrupt"] = check_interrupt  # Also expose for manual checks
 
+                    cpu_state["start"] = time.thread_time()
                     with torch.inference_mode(False):  # Counter ComfyUI's mode
                         another_name = exec
                         another_name(compiled_code, _NOTEBOOK_GLOBALS)
                 except Exception as e:
                     execution_result["exception"] = e
                 finally:
+                    # Release the kernel only when the code has returned, even after a timeout
+                    kernel_lock.release()
                     execution_event.set()
 
             stdout_capture.write("\u200b")  # Send a zero-width space to clear any existing output
 
             exec_thread = threading.Thread(target=execute_in_thread, daemon=True)
             exec_thread.start()
+            lock_handed_off = True
 
             stdout_state["last_output_length"] = 0
             # Monitor thread and check for interrupts
@@ -364,6 +470,12 @@ class NotebookCell(io.ComfyNode):
                     push_stdout_updates(force=True)
                     raise ProcessingInterrupted("Code execution interrupted by user")
 
+                if timeout and time.perf_counter() - execution_start > timeout:
+                    interrupt_flag.set()
+                    stdout_capture.write(f"\n[Execution timed out after {timeout:g}s]")
+                    push_stdout_updates(force=True)
+                    raise CellBudgetExceeded(f"Cell exceeded its timeout of {timeout:g}s")
+
             if execution_result["exception"]:
                 stdout_capture.write(f"\n[Execution error]\n{execution_result['exception']}")
                 push_stdout_updates(force=True)
@@ -376,6 +488,10 @@ class NotebookCell(io.ComfyNode):
             # Restore stdout
             push_stdout_updates(force=True)
             sys.stdout = old_stdout
+            if not lock_handed_off:
+                kernel_lock.release()
+            notebook_metrics.CELL_EXECUTION_SECONDS.observe(time.perf_counter() - execution_start)
+            notebook_metrics.CELL_STDOUT_BYTES.inc(len(stdout_capture.getvalue().encode("utf-8")))
 
         # Get captured output
         stdout_output = stdout_capture.getvalue()
@@ -392,7 +508,9 @@ class NotebookCell(io.ComfyNode):
         else:
             output_Plot = torch.ones((1, 1, 1, 3), dtype=torch.float32)
 
-        output_Result = _NOTEBOOK_GLOBALS.get("Result", None)
+        output_Result = transfer_session.apply(_NOTEBOOK_GLOBALS.get("Result", None))
+        if pack_result:
+            output_Result = notebook_packing.pack_result(output_Result)
 
         # Clean up the output
         if not output_Stdout:
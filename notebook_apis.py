@@ -1,9 +1,37 @@
+import asyncio
 import server
 import types
 import inspect
 import os
 import shutil
 from aiohttp import web
+from . import notebook_metrics
+from .notebook_limits import _KERNEL_LIMITS, _KERNEL_LOCKS
+from .notebook_transfer import _TRANSFER_TOTALS
+
+
+# Kernel entries injected by NotebookCell rather than defined by the user
+_VARIABLES_TO_IGNORE = [
+    "input",
+    "input_2",
+    "Result",
+    "__builtins__",
+    "check_interrupt",
+    "range",
+    "enumerate",
+    "next",
+    "iter",
+    "zip",
+    "map",
+    "filter",
+    "__doc__",
+    "__loader__",
+    "__name__",
+    "__package__",
+    "__spec__",
+    "__file__",
+    "__cached__",
+]
 
 
 def register_routes(_NOTEBOOK_KERNELS, _PRELOAD_MODULES):
@@ -19,10 +47,14 @@ def register_routes(_NOTEBOOK_KERNELS, _PRELOAD_MODULES):
 
         if workflow_id and workflow_id in _NOTEBOOK_KERNELS:
             _NOTEBOOK_KERNELS.pop(workflow_id, None)
+            _KERNEL_LIMITS.pop(workflow_id)
+            _KERNEL_LOCKS.pop(workflow_id)
             cleared.append(workflow_id)
         else:
             cleared.extend(list(_NOTEBOOK_KERNELS.keys()))
             _NOTEBOOK_KERNELS.clear()
+            _KERNEL_LIMITS.clear()
+            _KERNEL_LOCKS.clear()
 
         server.PromptServer.instance.prompt_queue.set_flag("unload_models", True)
         server.PromptServer.instance.prompt_queue.set_flag("free_memory", True)
@@ -39,27 +71,7 @@ def register_routes(_NOTEBOOK_KERNELS, _PRELOAD_MODULES):
     async def list_notebook_variables(request):
 
         kernels = {}
-        list_to_ignore = [
-            "input",
-            "input_2",
-            "Result",
-            "__builtins__",
-            "check_interrupt",
-            "range",
-            "enumerate",
-            "next",
-            "iter",
-            "zip",
-            "map",
-            "filter",
-            "__doc__",
-            "__loader__",
-            "__name__",
-            "__package__",
-            "__spec__",
-            "__file__",
-            "__cached__",
-        ]
+        list_to_ignore = list(_VARIABLES_TO_IGNORE)
         list_to_ignore.extend(_PRELOAD_MODULES.keys())
 
         for workflow_id, kernel in _NOTEBOOK_KERNELS.items():
@@ -87,6 +99,40 @@ def register_routes(_NOTEBOOK_KERNELS, _PRELOAD_MODULES):
 
         return web.json_response({"status": "ok", "count": len(kernels), "kernels": kernels})
 
+    @server.PromptServer.instance.routes.get("/notebook/metrics")
+    async def notebook_metrics_endpoint(request):
+        """
+        Expose notebook activity in the Prometheus text format.
+        """
+        variables_to_ignore = set(_VARIABLES_TO_IGNORE) | set(_PRELOAD_MODULES)
+        # Walking kernel variables can take a while; keep it off the server's event loop
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(
+            None, notebook_metrics.render_metrics, _NOTEBOOK_KERNELS, variables_to_ignore, _TRANSFER_TOTALS
+        )
+        return web.Response(text=body, content_type="text/plain", charset="utf-8")
+
+    @server.PromptServer.instance.routes.post("/notebook/limits")
+    async def set_notebook_limits(request):
+        """
+        Set per-kernel limits: timeout and cpu_budget in seconds, 0 = none.
+        """
+        try:
+            payload = await request.json()
+        except Exception:
+            payload = {}
+
+        workflow_id = payload.get("workflow_id")
+        if workflow_id is None:
+            return web.json_response({"status": "error", "message": "workflow_id is required"}, status=400)
+
+        try:
+            _KERNEL_LIMITS.set(workflow_id, timeout=payload.get("timeout"), cpu_budget=payload.get("cpu_budget"))
+        except (TypeError, ValueError) as e:
+            return web.json_response({"status": "error", "message": str(e)}, status=400)
+
+        return web.json_response({"status": "ok", "kernels": _KERNEL_LIMITS.all()})
+
     @server.PromptServer.instance.routes.post("/notebook/clear_temp_files")
     async def clear_temp_files(request):
         temp_dir = os.path.join(os.path.dirname(__file__), "temp_notebook_cells")
@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class CellBudgetExceeded(Exception):
+    """Raised when a cell runs past its wall-clock timeout or CPU budget."""
+
+
+class KernelLimits:
+    """Per-kernel default limits, applied on top of the limits set on each cell."""
+
+    def __init__(self):
+        self._limits = {}
+
+    def set(self, workflow_id, timeout=None, cpu_budget=None):
+        limits = self._limits.setdefault(str(workflow_id), {"timeout": 0.0, "cpu_budget": 0.0})
+        if timeout is not None:
+            limits["timeout"] = max(0.0, float(timeout))
+        if cpu_budget is not None:
+            limits["cpu_budget"] = max(0.0, float(cpu_budget))
+        return dict(limits)
+
+    def get(self, workflow_id):
+        return dict(self._limits.get(str(workflow_id), {"timeout": 0.0, "cpu_budget": 0.0}))
+
+    def pop(self, workflow_id):
+        self._limits.pop(str(workflow_id), None)
+
+    def clear(self):
+        self._limits.clear()
+
+    def all(self):
+        return {key: dict(value) for key, value in self._limits.items()}
+
+
+class KernelLocks:
+    """
+    One lock per kernel. A cell takes it before touching the kernel globals and
+    its execution thread releases it only when the code has actually returned,
+    so a cell stopped by a timeout keeps the kernel busy until it stops running.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, workflow_id):
+        with self._guard:
+            return self._locks.setdefault(str(workflow_id), threading.Lock())
+
+    def acquire(self, workflow_id, timeout=0.0, should_abort=None, on_wait=None, poll=0.1):
+        """
+        Take the kernel's lock, waiting for a previous cell that is still running.
+        Returns the lock, or None if 'should_abort' returned True while waiting.
+        Raises CellBudgetExceeded if 'timeout' seconds (0 = none) pass first.
+        The lock is looked up again on every poll, so freeing the kernel ends the wait.
+        """
+        lock = self.get(workflow_id)
+        if lock.acquire(blocking=False):
+            return lock
+        if on_wait is not None:
+            on_wait()
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            lock = self.get(workflow_id)
+            if lock.acquire(timeout=poll):
+                return lock
+            if should_abort is not None and should_abort():
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                raise CellBudgetExceeded(
+                    f"Cell exceeded its timeout of {timeout:g}s waiting for a previous cell of this kernel to stop"
+                )
+
+    def pop(self, workflow_id):
+        """Forget the kernel's lock; a still-running thread releases its old lock without blocking a new kernel."""
+        with self._guard:
+            self._locks.pop(str(workflow_id), None)
+
+    def clear(self):
+        with self._guard:
+            self._locks.clear()
+
+
+def effective_limit(cell_value, kernel_value):
+    """Combine a cell limit and a kernel limit (0 means unlimited): the stricter one wins."""
+    values = [v for v in (cell_value or 0.0, kernel_value or 0.0) if v > 0]
+    return min(values) if values else 0.0
+
+
+_KERNEL_LIMITS = KernelLimits()
+_KERNEL_LOCKS = KernelLocks()
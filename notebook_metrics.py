@@ -0,0 +1,248 @@
+import sys
+import types
+import inspect
+import itertools
+import threading
+from collections import deque
+
+import torch
+import numpy as np
+
+
+# Pending observations are folded into the totals on scrape, or when this many pile up
+_FOLD_THRESHOLD = 10000
+
+# Limits for walking containers when estimating kernel variable memory; objects
+# past them are left out, so the estimate stays cheap on huge nested lists
+_MAX_CONTAINER_DEPTH = 4
+_MAX_CONTAINER_ITEMS = 100000
+_MAX_VISITED_OBJECTS = 200000
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Metric:
+    """
+    Base class for metrics that are cheap to update from cell execution.
+    Updates only append to a deque (atomic in CPython, no lock taken); the
+    pending values are aggregated when the metrics are scraped.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._pending = deque()
+        self._fold_lock = threading.Lock()
+
+    def _push(self, value):
+        self._pending.append(value)
+        if len(self._pending) > _FOLD_THRESHOLD and self._fold_lock.acquire(blocking=False):
+            try:
+                self._fold()
+            finally:
+                self._fold_lock.release()
+
+    def _fold(self):
+        pending = self._pending
+        while True:
+            try:
+                self._apply(pending.popleft())
+            except IndexError:
+                break
+
+    def collect(self):
+        with self._fold_lock:
+            self._fold()
+            return self._samples()
+
+    def _apply(self, value):
+        raise NotImplementedError
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        super().__init__(name, documentation)
+        self._value = 0
+
+    def inc(self, amount=1):
+        self._push(amount)
+
+    def _apply(self, value):
+        self._value += value
+
+    def _samples(self):
+        return [(self.name, {}, self._value)]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=_SECONDS_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        self._bucket_counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, value):
+        self._push(value)
+
+    def _apply(self, value):
+        self._count += 1
+        self._sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self._bucket_counts[i] += 1
+                break
+
+    def _samples(self):
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self._bucket_counts):
+            cumulative += count
+            samples.append((f"{self.name}_bucket", {"le": _format_value(bound)}, cumulative))
+        samples.append((f"{self.name}_bucket", {"le": "+Inf"}, self._count))
+        samples.append((f"{self.name}_sum", {}, self._sum))
+        samples.append((f"{self.name}_count", {}, self._count))
+        return samples
+
+
+CELL_EXECUTION_SECONDS = Histogram("notebook_cell_execution_seconds", "Wall-clock time of NotebookCell executions.")
+CELL_STDOUT_BYTES = Counter("notebook_cell_stdout_bytes_total", "Bytes of stdout captured from cells.")
+CELL_ERRORS = Counter("notebook_cell_errors_total", "Cells that raised an exception.")
+CELL_INTERRUPTS = Counter("notebook_cell_interrupts_total", "Cells interrupted by the user.")
+CELL_TIMEOUTS = Counter("notebook_cell_timeouts_total", "Cells stopped by their timeout or CPU budget.")
+PLOTS = Counter("notebook_plots_total", "Matplotlib figures captured as Plot output.")
+PLOT_CAPTURE_SECONDS = Histogram("notebook_plot_capture_seconds", "Time spent rendering a figure into the Plot output.")
+
+_METRICS = [
+    CELL_EXECUTION_SECONDS,
+    CELL_STDOUT_BYTES,
+    CELL_ERRORS,
+    CELL_INTERRUPTS,
+    CELL_TIMEOUTS,
+    PLOTS,
+    PLOT_CAPTURE_SECONDS,
+]
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else f"{value:.1f}"
+    return str(value)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        label_str = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_str}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _shallow_nbytes(value):
+    try:
+        return sys.getsizeof(value)
+    except Exception:
+        return 0
+
+
+def _buffer_nbytes(value, seen_buffers):
+    """Bytes of the memory behind a tensor/array, counted once per buffer however many views share it."""
+    if isinstance(value, torch.Tensor):
+        try:
+            storage = value.untyped_storage()
+            key = (str(value.device), storage.data_ptr())
+            nbytes = storage.nbytes()
+        except Exception:  # e.g. sparse tensors
+            return value.element_size() * value.nelement()
+    else:
+        root = value
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        key = ("cpu", root.__array_interface__["data"][0])
+        nbytes = root.nbytes
+    if key in seen_buffers:
+        return 0
+    seen_buffers.add(key)
+    return nbytes
+
+
+class _MemoryEstimate:
+    """
+    Approximate memory held by kernel variables. Every object is counted once,
+    so shared scalars, containers and tensor/array buffers are not double counted.
+    """
+
+    def __init__(self, max_objects=_MAX_VISITED_OBJECTS):
+        self.max_objects = max_objects
+        self.seen_buffers = set()
+        self.seen_objects = set()
+
+    def add(self, value, depth=0):
+        if len(self.seen_objects) >= self.max_objects or id(value) in self.seen_objects:
+            return 0
+        self.seen_objects.add(id(value))
+        if isinstance(value, (torch.Tensor, np.ndarray)):
+            return _buffer_nbytes(value, self.seen_buffers)
+        total = _shallow_nbytes(value)
+        if type(value) in (list, tuple, dict) and depth < _MAX_CONTAINER_DEPTH:
+            items = value.values() if type(value) is dict else value
+            for item in itertools.islice(items, _MAX_CONTAINER_ITEMS):
+                total += self.add(item, depth + 1)
+        return total
+
+
+def _kernel_variable_bytes(kernel, variables_to_ignore):
+    estimate = _MemoryEstimate()
+    total = 0
+    for key, value in list(kernel.__dict__.items()):
+        if key in variables_to_ignore:
+            continue
+        if isinstance(value, types.ModuleType) or inspect.isclass(value):
+            continue
+        try:
+            total += estimate.add(value)
+        except RuntimeError:
+            pass  # Container changed size while a cell was running
+    return total
+
+
+def render_metrics(_NOTEBOOK_KERNELS, variables_to_ignore, transfer_totals):
+    """Aggregate all metrics and render them in the Prometheus text exposition format."""
+    lines = []
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.collect():
+            lines.append(_format_sample(name, labels, value))
+
+    lines.append("# HELP notebook_transfer_bytes_total Bytes moved by cell transfer policies.")
+    lines.append("# TYPE notebook_transfer_bytes_total counter")
+    lines.append(_format_sample("notebook_transfer_bytes_total", {}, transfer_totals["bytes_moved"]))
+
+    kernels = list(_NOTEBOOK_KERNELS.items())
+    lines.append("# HELP notebook_kernels Number of live notebook kernels.")
+    lines.append("# TYPE notebook_kernels gauge")
+    lines.append(_format_sample("notebook_kernels", {}, len(kernels)))
+
+    lines.append(
+        "# HELP notebook_kernel_variable_bytes Approximate memory held by variables of each kernel "
+        f"(at most {_MAX_VISITED_OBJECTS} objects are visited per kernel)."
+    )
+    lines.append("# TYPE notebook_kernel_variable_bytes gauge")
+    for workflow_id, kernel in kernels:
+        nbytes = _kernel_variable_bytes(kernel, variables_to_ignore)
+        lines.append(_format_sample("notebook_kernel_variable_bytes", {"workflow_id": workflow_id}, nbytes))
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,159 @@
+import itertools
+import numbers
+
+import torch
+import numpy as np
+
+
+# Smaller Results are cheaper to pass as is than to pack
+_MIN_PACK_ELEMENTS = 256
+
+_NUMERIC_KINDS = "biuf"
+
+
+class PackedResult:
+    """
+    Lightweight wrapper around a Result converted once into contiguous buffers.
+
+    A homogeneous numeric list becomes a single numpy array. A dict of arrays
+    becomes either one columnar buffer (equal-length 1-D columns stacked as rows)
+    or one contiguous array/tensor per key. A receiving NotebookCell unpacks it
+    into zero-copy views of these buffers.
+    """
+
+    __slots__ = ("kind", "buffer", "keys", "columns")
+
+    def __init__(self, kind, buffer=None, keys=None, columns=None):
+        self.kind = kind  # "list", "columnar" or "dict"
+        self.buffer = buffer
+        self.keys = keys
+        self.columns = columns
+
+    @property
+    def nbytes(self):
+        if self.kind == "dict":
+            return sum(_nbytes(v) for v in self.columns.values())
+        return _nbytes(self.buffer)
+
+    def unpack(self):
+        if self.kind == "list":
+            return self.buffer
+        if self.kind == "columnar":
+            # Each row of a C-contiguous 2-D buffer is itself a contiguous view
+            return {key: self.buffer[i] for i, key in enumerate(self.keys)}
+        return dict(self.columns)
+
+    def __repr__(self):
+        if self.kind == "dict":
+            return f"PackedResult(dict, keys={len(self.columns)}, nbytes={self.nbytes})"
+        return f"PackedResult({self.kind}, shape={tuple(self.buffer.shape)}, dtype={self.buffer.dtype}, nbytes={self.nbytes})"
+
+
+def _nbytes(value):
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    return value.nbytes
+
+
+def _numel(value):
+    if isinstance(value, torch.Tensor):
+        return value.nelement()
+    return value.size
+
+
+def _looks_numeric(value):
+    return isinstance(value, (numbers.Number, np.number, np.bool_)) and not isinstance(value, complex)
+
+
+def _scalar_category(value):
+    if isinstance(value, (bool, np.bool_)):
+        return "b"
+    if isinstance(value, (numbers.Integral, np.integer)):
+        return "i"
+    return "f"
+
+
+def _leaves(value, depth):
+    if depth <= 1:
+        return value
+    return itertools.chain.from_iterable(_leaves(v, depth - 1) for v in value)
+
+
+def _numeric_list_to_array(value):
+    """Convert a (possibly nested) homogeneous numeric list, or return None."""
+    if not value:
+        return None
+    first = value[0]
+    # Cheap check on the first element before paying for a full conversion
+    if isinstance(first, (list, tuple)):
+        if not first or not _looks_numeric(first[0]):
+            return None
+    elif not _looks_numeric(first):
+        return None
+    try:
+        array = np.asarray(value)
+    except (ValueError, TypeError):
+        return None  # Ragged nested lists
+    if array.dtype.kind not in _NUMERIC_KINDS:
+        return None
+    # numpy promotes mixed lists (ints to float64, bools to ints), which can change values;
+    # packing must be lossless, so such lists are left unpacked
+    if array.dtype.kind != "b":
+        categories = {_scalar_category(v) for v in _leaves(value, array.ndim)}
+        if len(categories) > 1:
+            return None
+    return np.ascontiguousarray(array)
+
+
+def _to_column(value):
+    if isinstance(value, torch.Tensor):
+        return value.contiguous()
+    if isinstance(value, np.ndarray):
+        return np.ascontiguousarray(value) if value.dtype.kind in _NUMERIC_KINDS else None
+    if type(value) is list:
+        return _numeric_list_to_array(value)
+    return None
+
+
+def _pack_dict(value):
+    columns = {}
+    for key, item in value.items():
+        column = _to_column(item)
+        if column is None:
+            return None
+        columns[key] = column
+    if sum(_numel(c) for c in columns.values()) < _MIN_PACK_ELEMENTS:
+        return None
+
+    # One columnar buffer only for equal-length 1-D columns of a single dtype; stacking
+    # mixed dtypes would promote them (e.g. int64 ids to float64) and lose precision
+    values = list(columns.values())
+    lengths = {c.shape[0] if c.ndim == 1 else -1 for c in values}
+    if len(lengths) == 1 and -1 not in lengths:
+        if all(isinstance(c, np.ndarray) for c in values):
+            if len({c.dtype for c in values}) == 1:
+                return PackedResult("columnar", buffer=np.stack(values), keys=list(columns))
+        elif all(isinstance(c, torch.Tensor) for c in values):
+            if len({(c.dtype, c.device) for c in values}) == 1:
+                return PackedResult("columnar", buffer=torch.stack(values), keys=list(columns))
+    return PackedResult("dict", columns=columns)
+
+
+def pack_result(value):
+    """Pack a large numeric list or dict of arrays; anything else is returned unchanged."""
+    if type(value) is list and len(value) >= _MIN_PACK_ELEMENTS:
+        array = _numeric_list_to_array(value)
+        if array is not None:
+            return PackedResult("list", buffer=array)
+    elif type(value) is dict and value:
+        packed = _pack_dict(value)
+        if packed is not None:
+            return packed
+    return value
+
+
+def unpack_result(value):
+    """Unpack a PackedResult into zero-copy views; anything else is returned unchanged."""
+    if isinstance(value, PackedResult):
+        return value.unpack()
+    return value
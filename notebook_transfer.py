@@ -0,0 +1,103 @@
+import torch
+import numpy as np
+
+
+# Transfer policies that can be selected per cell. They are applied once at the
+# NotebookCell boundary: to 'input'/'input_2' before the code runs and to 'Result'
+# after it finishes.
+TRANSFER_POLICIES = ["keep", "cpu_pinned", "numpy", "contiguous"]
+
+# Running totals across all cells, readable from cells via 'Notebook.transfer_totals'
+_TRANSFER_TOTALS = {"bytes_moved": 0, "transfers": 0, "dedup_hits": 0}
+
+
+def _tensor_nbytes(tensor):
+    return tensor.element_size() * tensor.nelement()
+
+
+class TransferSession:
+    """
+    Apply one transfer policy to a set of values, converting each distinct
+    tensor/array only once. When the same object feeds both inputs (or is
+    returned as Result), the converted object is reused instead of copied again.
+    """
+
+    def __init__(self, policy="keep"):
+        if policy not in TRANSFER_POLICIES:
+            raise ValueError(f"Unknown transfer policy '{policy}'. Expected one of {TRANSFER_POLICIES}.")
+        self.policy = policy
+        self.stats = {"policy": policy, "bytes_moved": 0, "transfers": 0, "dedup_hits": 0}
+        # id(original) -> (original, converted). The original is kept alive so its id is not reused.
+        self._memo = {}
+
+    def apply(self, value):
+        if self.policy == "keep":
+            return value
+        return self._convert(value)
+
+    def _convert(self, value):
+        if isinstance(value, (torch.Tensor, np.ndarray)):
+            key = id(value)
+            if key in self._memo:
+                self.stats["dedup_hits"] += 1
+                _TRANSFER_TOTALS["dedup_hits"] += 1
+                return self._memo[key][1]
+            converted = self._convert_array(value)
+            self._memo[key] = (value, converted)
+            return converted
+        # Recurse into plain containers so 'Result = x, y' is handled too.
+        # Containers without converted children are returned as is, keeping their identity.
+        if type(value) in (list, tuple):
+            converted = [self._convert(v) for v in value]
+            if all(c is v for c, v in zip(converted, value)):
+                return value
+            return type(value)(converted)
+        if type(value) is dict:
+            converted = {k: self._convert(v) for k, v in value.items()}
+            if all(converted[k] is v for k, v in value.items()):
+                return value
+            return converted
+        return value
+
+    def _record(self, nbytes):
+        self.stats["bytes_moved"] += nbytes
+        self.stats["transfers"] += 1
+        _TRANSFER_TOTALS["bytes_moved"] += nbytes
+        _TRANSFER_TOTALS["transfers"] += 1
+
+    def _convert_array(self, value):
+        if isinstance(value, np.ndarray):
+            if self.policy == "contiguous" and not value.flags["C_CONTIGUOUS"]:
+                self._record(value.nbytes)
+                return np.ascontiguousarray(value)
+            # numpy arrays already live on the host, nothing to move for the other policies
+            return value
+
+        if self.policy == "cpu_pinned":
+            if value.device.type == "cpu":
+                return value
+            self._record(_tensor_nbytes(value))
+            if not torch.cuda.is_available():
+                return value.detach().cpu()
+            # Copy straight into a pinned buffer instead of going through pageable memory first
+            pinned = torch.empty(value.shape, dtype=value.dtype, pin_memory=True)
+            return pinned.copy_(value.detach())
+
+        if self.policy == "numpy":
+            if value.device.type != "cpu":
+                self._record(_tensor_nbytes(value))
+            tensor = value.detach().cpu()
+            try:
+                # Zero-copy view for CPU tensors: the array shares memory with the tensor
+                return tensor.numpy()
+            except (TypeError, RuntimeError):
+                # dtypes numpy can't represent (e.g. bfloat16) stay as tensors
+                return tensor
+
+        if self.policy == "contiguous":
+            if value.is_contiguous():
+                return value
+            self._record(_tensor_nbytes(value))
+            return value.contiguous()
+
+        return value
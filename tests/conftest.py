@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The extension is loaded by ComfyUI as a package; the modules tested here have no
+# ComfyUI imports, so they are imported directly from the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
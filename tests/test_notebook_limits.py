@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from notebook_limits import CellBudgetExceeded, KernelLimits, KernelLocks, effective_limit
+
+
+def test_effective_limit_picks_stricter_nonzero_value():
+    assert effective_limit(0, 0) == 0.0
+    assert effective_limit(0, 5) == 5
+    assert effective_limit(3, 0) == 3
+    assert effective_limit(3, 5) == 3
+    assert effective_limit(None, 2) == 2
+
+
+def test_kernel_limits_set_get_pop_clear():
+    limits = KernelLimits()
+    assert limits.get("wf") == {"timeout": 0.0, "cpu_budget": 0.0}
+    assert limits.set("wf", timeout=10) == {"timeout": 10.0, "cpu_budget": 0.0}
+    assert limits.set("wf", cpu_budget="2.5") == {"timeout": 10.0, "cpu_budget": 2.5}
+    assert limits.set("wf", timeout=-1)["timeout"] == 0.0
+    limits.set("other", timeout=1)
+    limits.pop("wf")
+    assert limits.get("wf") == {"timeout": 0.0, "cpu_budget": 0.0}
+    assert list(limits.all()) == ["other"]
+    limits.clear()
+    assert limits.all() == {}
+
+
+def test_kernel_lock_is_shared_per_kernel_and_releasable_from_another_thread():
+    locks = KernelLocks()
+    lock = locks.get("wf")
+    assert locks.get("wf") is lock
+    assert locks.get("other") is not lock
+
+    assert lock.acquire(blocking=False)
+    assert not locks.get("wf").acquire(blocking=False)
+    # The execution thread releases the lock taken by the cell
+    worker = threading.Thread(target=lock.release)
+    worker.start()
+    worker.join()
+    assert lock.acquire(timeout=1)
+    lock.release()
+
+
+def test_popped_kernel_gets_a_fresh_lock():
+    locks = KernelLocks()
+    stale = locks.get("wf")
+    assert stale.acquire(blocking=False)  # Held by a runaway cell
+    locks.pop("wf")
+    fresh = locks.get("wf")
+    assert fresh is not stale
+    assert fresh.acquire(blocking=False)
+    locks.get("other")
+    locks.clear()
+    assert locks.get("wf") is not fresh
+
+
+def _hold_lock(lock, release_event):
+    """Simulate a timed-out cell whose code is still running."""
+    release_event.wait()
+    lock.release()
+
+
+def test_acquire_after_timed_out_cell_honours_timeout_then_free_unblocks():
+    locks = KernelLocks()
+    stale = locks.acquire("wf")
+    release_event = threading.Event()
+    runaway = threading.Thread(target=_hold_lock, args=(stale, release_event), daemon=True)
+    runaway.start()
+
+    # The next cell of the kernel gives up after its own timeout
+    waited = []
+    start = time.monotonic()
+    with pytest.raises(CellBudgetExceeded):
+        locks.acquire("wf", timeout=0.2, on_wait=lambda: waited.append(True), poll=0.02)
+    assert waited == [True]
+    assert time.monotonic() - start < 1.0
+
+    # An interrupt aborts the wait
+    assert locks.acquire("wf", should_abort=lambda: True, poll=0.02) is None
+
+    # Freeing the kernel lets the next cell run while the old code is still going
+    locks.pop("wf")
+    fresh = locks.acquire("wf", timeout=0.2, poll=0.02)
+    assert fresh is not stale
+    fresh.release()
+
+    release_event.set()
+    runaway.join()
+
+
+def test_free_while_waiting_ends_the_wait():
+    locks = KernelLocks()
+    locks.acquire("wf")  # Never released, like a cell stuck in time.sleep(1e9)
+    threading.Timer(0.1, locks.pop, args=("wf",)).start()
+    lock = locks.acquire("wf", timeout=2.0, poll=0.02)
+    assert lock is locks.get("wf")
+    lock.release()
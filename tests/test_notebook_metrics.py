@@ -0,0 +1,86 @@
+import types
+
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+import notebook_metrics
+from notebook_metrics import Counter, Histogram, _MemoryEstimate, _buffer_nbytes, render_metrics
+
+
+def test_counter_folds_pending_increments_on_collect():
+    counter = Counter("test_total", "Test counter.")
+    counter.inc()
+    counter.inc(4)
+    assert counter.collect() == [("test_total", {}, 5)]
+    counter.inc(2)
+    assert counter.collect() == [("test_total", {}, 7)]
+
+
+def test_counter_folds_when_pending_values_pile_up(monkeypatch):
+    monkeypatch.setattr(notebook_metrics, "_FOLD_THRESHOLD", 3)
+    counter = Counter("test_total", "Test counter.")
+    for _ in range(5):
+        counter.inc()
+    assert len(counter._pending) <= 3
+    assert counter.collect() == [("test_total", {}, 5)]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value)
+    samples = histogram.collect()
+    assert samples == [
+        ("test_seconds_bucket", {"le": "0.1"}, 1),
+        ("test_seconds_bucket", {"le": "1.0"}, 3),
+        ("test_seconds_bucket", {"le": "+Inf"}, 4),
+        ("test_seconds_sum", {}, 6.25),
+        ("test_seconds_count", {}, 4),
+    ]
+
+
+def test_buffer_counted_once_for_shared_storage():
+    seen = set()
+    t = torch.zeros(1000)
+    assert _buffer_nbytes(t, seen) == 4000
+    assert _buffer_nbytes(t[:10], seen) == 0
+    assert _buffer_nbytes(t.view(10, 100), seen) == 0
+
+    a = np.zeros(100)
+    assert _buffer_nbytes(a[5:], seen) == 800
+    assert _buffer_nbytes(a, seen) == 0
+    # torch.from_numpy shares the array's memory
+    assert _buffer_nbytes(torch.from_numpy(a), seen) == 0
+
+
+def test_memory_estimate_recurses_into_containers_and_is_bounded():
+    t = torch.zeros(1000)
+    estimate = _MemoryEstimate()
+    total = estimate.add({"a": [t, t[:5]], "b": t})
+    assert 4000 < total < 5000
+
+    scalars = [0.5] * 1000
+    shared = _MemoryEstimate().add(scalars)
+    assert shared < 2 * 1000 * 8 + 100  # The same float object is counted once
+
+    capped = _MemoryEstimate(max_objects=10)
+    capped.add([float(i) for i in range(1000)])
+    assert len(capped.seen_objects) == 10
+
+
+def test_render_metrics_prometheus_text():
+    kernel = types.ModuleType("notebook_kernel_test")
+    kernel.__dict__.update({"x": torch.zeros(10), "input": torch.zeros(1000), "np": np})
+    variables_to_ignore = set(types.ModuleType("empty").__dict__) | {"input", "np"}
+    body = render_metrics({'wf"1': kernel}, variables_to_ignore, {"bytes_moved": 123})
+    lines = body.splitlines()
+    assert body.endswith("\n")
+    assert "# TYPE notebook_cell_execution_seconds histogram" in lines
+    assert any(line.startswith('notebook_cell_execution_seconds_bucket{le="+Inf"} ') for line in lines)
+    assert "# TYPE notebook_cell_errors_total counter" in lines
+    assert "notebook_transfer_bytes_total 123" in lines
+    assert "notebook_kernels 1" in lines
+    # Ignored names are skipped and label values are escaped
+    assert 'notebook_kernel_variable_bytes{workflow_id="wf\\"1"} 40' in lines
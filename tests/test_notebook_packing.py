@@ -0,0 +1,102 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+from notebook_packing import PackedResult, pack_result, unpack_result
+
+
+def test_numeric_list_round_trip():
+    values = [float(i) for i in range(1000)]
+    packed = pack_result(values)
+    assert isinstance(packed, PackedResult)
+    assert packed.kind == "list"
+    unpacked = unpack_result(packed)
+    assert unpacked is packed.buffer
+    assert unpacked.dtype == np.float64
+    assert unpacked.tolist() == values
+
+
+def test_nested_numeric_list_becomes_2d_array():
+    rows = [[i, i + 1, i + 2] for i in range(300)]
+    unpacked = unpack_result(pack_result(rows))
+    assert unpacked.shape == (300, 3)
+    assert unpacked.flags["C_CONTIGUOUS"]
+
+
+def test_small_ragged_and_non_numeric_lists_are_unchanged():
+    small = [1, 2, 3]
+    ragged = [[1, 2], [3]] * 200
+    strings = ["a"] * 1000
+    mixed = [1] * 500 + ["a"]
+    for value in (small, ragged, strings, mixed):
+        assert pack_result(value) is value
+
+
+def test_same_dtype_columns_share_one_buffer():
+    data = {"x": np.arange(300, dtype=np.float32), "y": [0.5] * 300}
+    data["y"] = np.asarray(data["y"], dtype=np.float32)
+    packed = pack_result(data)
+    assert packed.kind == "columnar"
+    unpacked = unpack_result(packed)
+    assert list(unpacked) == ["x", "y"]
+    assert np.shares_memory(unpacked["x"], packed.buffer)
+    assert np.shares_memory(unpacked["y"], packed.buffer)
+    np.testing.assert_array_equal(unpacked["x"], data["x"])
+
+
+def test_mixed_dtype_columns_keep_their_dtypes():
+    ids = np.array([2**62 + i for i in range(300)], dtype=np.int64)
+    data = {"ids": ids, "score": np.ones(300, dtype=np.float32), "flag": np.zeros(300, dtype=bool)}
+    packed = pack_result(data)
+    assert packed.kind == "dict"
+    unpacked = unpack_result(packed)
+    assert unpacked["ids"].dtype == np.int64
+    assert unpacked["score"].dtype == np.float32
+    assert unpacked["flag"].dtype == np.bool_
+    np.testing.assert_array_equal(unpacked["ids"], ids)
+
+
+def test_tensor_columns():
+    same = {"a": torch.arange(300), "b": torch.arange(300)}
+    packed = pack_result(same)
+    assert packed.kind == "columnar"
+    unpacked = unpack_result(packed)
+    assert unpacked["a"].data_ptr() == packed.buffer.data_ptr()
+    assert torch.equal(unpacked["b"], same["b"])
+
+    mixed = {"a": torch.arange(300), "b": torch.ones(300)}
+    unpacked = unpack_result(pack_result(mixed))
+    assert unpacked["a"].dtype == torch.int64
+    assert unpacked["b"].dtype == torch.float32
+
+
+def test_dicts_with_unsupported_values_are_unchanged():
+    data = {"x": np.arange(300), "label": "a"}
+    assert pack_result(data) is data
+
+
+def test_unpack_passes_other_values_through():
+    value = {"a": 1}
+    assert unpack_result(value) is value
+
+
+def test_mixed_int_float_lists_are_not_packed():
+    values = [2**62 + 1] + [0.5] * 300
+    assert pack_result(values) is values
+    nested = [[1, 2.5]] * 300
+    assert pack_result(nested) is nested
+    with_bools = [True] + [2] * 300
+    assert pack_result(with_bools) is with_bools
+
+
+def test_mixed_list_column_keeps_dict_unpacked():
+    data = {"ids": [2**62 + 1] + [0.5] * 300}
+    assert pack_result(data) is data
+
+
+def test_int_list_round_trips_exactly():
+    values = [2**62 + i for i in range(300)]
+    unpacked = unpack_result(pack_result(values))
+    assert unpacked.dtype == np.int64
+    assert unpacked.tolist() == values
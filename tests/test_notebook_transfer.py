@@ -0,0 +1,75 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+from notebook_transfer import TransferSession
+
+
+def test_keep_returns_inputs_untouched():
+    session = TransferSession("keep")
+    t = torch.arange(6).reshape(2, 3).t()
+    assert session.apply(t) is t
+    assert session.stats["bytes_moved"] == 0
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError):
+        TransferSession("gpu")
+
+
+def test_numpy_policy_is_zero_copy_view():
+    session = TransferSession("numpy")
+    t = torch.zeros(4)
+    array = session.apply(t)
+    assert isinstance(array, np.ndarray)
+    array[0] = 5
+    assert t[0] == 5
+    assert session.stats["bytes_moved"] == 0
+
+
+def test_shared_tensor_is_converted_once():
+    session = TransferSession("contiguous")
+    t = torch.arange(12, dtype=torch.float32).reshape(3, 4).t()
+    first = session.apply(t)
+    second = session.apply(t)
+    result = session.apply((t, 1))
+    assert first.is_contiguous()
+    assert second is first
+    assert result[0] is first
+    assert session.stats["transfers"] == 1
+    assert session.stats["bytes_moved"] == 12 * 4
+    assert session.stats["dedup_hits"] == 2
+
+
+def test_contiguous_numpy_accounting():
+    session = TransferSession("contiguous")
+    a = np.arange(20, dtype=np.int64).reshape(4, 5)
+    assert session.apply(a) is a
+    converted = session.apply(a.T)
+    assert converted.flags["C_CONTIGUOUS"]
+    assert session.stats["bytes_moved"] == a.nbytes
+
+
+def test_containers_without_tensors_keep_identity():
+    session = TransferSession("numpy")
+    values = [0.5] * 1000
+    payload = {"values": values, "meta": ("a", 1)}
+    assert session.apply(values) is values
+    assert session.apply(payload) is payload
+
+
+def test_containers_with_tensors_are_rebuilt():
+    session = TransferSession("numpy")
+    payload = {"x": torch.ones(3), "label": "a"}
+    converted = session.apply(payload)
+    assert converted is not payload
+    assert isinstance(converted["x"], np.ndarray)
+    assert converted["label"] == "a"
+
+
+def test_cpu_pinned_keeps_cpu_tensors():
+    session = TransferSession("cpu_pinned")
+    t = torch.ones(3)
+    assert session.apply(t) is t
+    assert session.stats["bytes_moved"] == 0
@@ -518,6 +518,23 @@ app.registerExtension({
             outputWidget.options.getMaxHeight = () => outputWidget.hidden ? 0 : height();
         };
 
+        // Workflows saved before the option widgets existed shift their values into them
+        const optionDefaults = { transfer: 'keep', timeout: 0, cpu_budget: 0, pack_result: false };
+        const onConfigure = nodeType.prototype.onConfigure;
+        nodeType.prototype.onConfigure = function (info) {
+            if (onConfigure) onConfigure.apply(this, [info]);
+
+            for (const [name, defaultValue] of Object.entries(optionDefaults)) {
+                const widget = this.widgets?.find((w) => w.name === name);
+                if (!widget) continue;
+                const options = widget.options?.values;
+                const invalid = Array.isArray(options)
+                    ? !options.includes(widget.value)
+                    : typeof widget.value !== typeof defaultValue || (typeof defaultValue === 'number' && !isFinite(widget.value));
+                if (invalid) widget.value = defaultValue;
+            }
+        };
+
         // Hook into onExecuted to update output widget
         const onExecuted = nodeType.prototype.onExecuted;
         nodeType.prototype.onExecuted = function (message) {